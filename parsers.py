@@ -3,17 +3,168 @@
 集中实现：各站点 list_parser / detail_fetcher / detail_parser / normalize。
 对外仅暴露 get_parsers(site_id)，由 registry 调用。
 """
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import itertools
 import json
+import logging
 import re
-from typing import Any, Callable, Dict, List, Optional
+import sys
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
 
-from bs4 import BeautifulSoup
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import CData, NavigableString
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import lxml  # noqa: F401
+
+    _SOUP_FEATURES = "lxml"
+except ImportError:
+    _SOUP_FEATURES = "html.parser"
 
 from .base import extract_int_price, extract_currency, parse_list_generic
 
+log = logging.getLogger(__name__)
+
+# 模块级预编译正则，避免在逐个商品的循环里重复编译 / 查 re 缓存
+_PRICE_RE = re.compile(r"RM\s*[\d,]+|€\s*[\d,]+|\$\s*[\d,]+")
+_PID_URL_RE = re.compile(r"/p/([^/]+)/")
+_PID_IMG_RE = re.compile(r"/([A-Za-z0-9_-]+)_[A-Z]\.jpg")
+_PID_BTN_RE = re.compile(r"pid=([A-Za-z0-9_-]+)")
+_CAT_RE = re.compile(r"/p/([^/]+)/")
+_COLOR_LABEL_RE = re.compile(r"select\s*colou?r", re.I)
+_COLOR_P_RE = re.compile(r"Color\s*:?")
+_WHY_MADE_RE = re.compile(r'"whyWeMadeThisAttributes":\{.*?"text":"(.*?)".*?\}')
+_PRICES_RE = re.compile(r'"list-price":"(?P<list_price>[\d.]+)".*?"sale-price":"(?P<sale_price>[\d.]+)"')
+
+
+def _json_loads(data: str) -> Any:
+    # orjson 不接受 str 子类（如 NavigableString），统一转成 bytes；孤立代理项用 surrogatepass 编码，不在这里抛错。
+    # orjson 比标准库严格（拒绝 NaN/Infinity、非法 UTF-8），失败时退回 json.loads，保证能解析的输入与原先一致；
+    # 两者的 JSONDecodeError 都是 json.JSONDecodeError，调用方的 except 分支不需要改
+    if orjson is not None:
+        try:
+            return orjson.loads(data.encode("utf-8", errors="surrogatepass"))
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _intern(value: Any) -> Any:
+    # brand / currency 这类列在上千条商品里取值只有寥寥几种，intern 后各条目共用同一个字符串对象
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def extract_prices_vec(texts: List[str]) -> tuple:
+    """
+    批量版 extract_int_price / extract_currency：逐段文本直接调用 .base 的两个函数，
+    结果与逐条调用完全一致（如 "€ 1.234,00" 的千分位写法、整段文本上的币种判定）。
+    返回等长的 (价格列表, 币种列表)；币种字符串做 intern，同页大量重复值共享同一对象。
+    """
+    prices: List[Optional[int]] = []
+    currencies: List[Optional[str]] = []
+    for text in texts:
+        prices.append(extract_int_price(text))
+        currencies.append(_intern(extract_currency(text)))
+    return prices, currencies
+
+
+# === make_soup ===
+
+# 仅对「解析器只读取这些子树」的页面做 SoupStrainer 裁剪；
+# 需要沿父节点回溯（balenciaga 兜底）或全文正则（lululemon 详情）的页面不能裁剪。
+_LIST_STRAINERS: Dict[str, SoupStrainer] = {
+    # 按 class 词匹配，与 lululemon_list_parser 的 find_all("div", class_="product-tile") 一致（含多 class 的 tile）
+    "lululemon": SoupStrainer("div", attrs={"class": re.compile(r"(^|\s)product-tile(\s|$)")}),
+}
+
+
+def make_soup(html: str, site_id: str, page: str = "list") -> BeautifulSoup:
+    """
+    用 lxml（不可用时退回 html.parser）构建 soup；page="list" 且该站登记了 strainer 时只解析相关子树。
+    """
+    strainer = _LIST_STRAINERS.get(site_id) if page == "list" else None
+    return BeautifulSoup(html, _SOUP_FEATURES, parse_only=strainer)
+
 
 # === Balenciaga ===
 
+# 详情页选择器在模块加载时编译一次，解析时直接复用
+_BALENCIAGA_SEL = {
+    "name": sv.compile("h1.c-product__name"),
+    "desc": sv.compile("p.c-product__longdesc"),
+    "img": sv.compile("img.c-product__image"),
+    "bread": sv.compile(".c-breadcrumbs__link"),
+    "pid_btn": sv.compile("button[data-url*='pid=']"),
+}
+
+
+def _collect_tiles(soup: BeautifulSoup) -> List[tuple]:
+    """
+    单次自底向上遍历：为每个节点记下其子树内（文档序）首个 h2/h3、itemprop=price、itemprop=priceCurrency，
+    再为每个 a[href*='.html']（已排除 searchajax / prefn 筛选链接）沿祖先链查表，返回 (a, 标题文本, 价格元素, 币种元素)。
+    结果与逐层 parent.find(...) 一致：标题最多上溯 5 层，价格最多 8 层，但不再重复遍历重叠的祖先子树。
+    同一张卡片里的多个链接共用标题，标题文本按元素缓存，只取一次 get_text。
+    """
+    tags = [el for el in soup.descendants if el.name]
+    heading_in: Dict[int, Any] = {}
+    price_in: Dict[int, Any] = {}
+    currency_in: Dict[int, Any] = {}
+    # 逆先序：子树先于其根处理；同一父节点下靠前的子节点后处理，覆盖后即为文档序第一个
+    for el in reversed(tags):
+        key, own = id(el.parent), id(el)
+        heading = el if el.name in ("h2", "h3") else heading_in.get(own)
+        if heading is not None:
+            heading_in[key] = heading
+        itemprop = el.get("itemprop")
+        price_el = el if itemprop == "price" else price_in.get(own)
+        if price_el is not None:
+            price_in[key] = price_el
+        curr_el = el if itemprop == "priceCurrency" else currency_in.get(own)
+        if curr_el is not None:
+            currency_in[key] = curr_el
+
+    heading_text: Dict[int, str] = {}
+    tiles = []
+    for a in tags:
+        if a.name != "a":
+            continue
+        # 筛选/分页链接在这里就丢掉，省掉后面的祖先链查找
+        href = a.get("href") or ""
+        if ".html" not in href or "searchajax" in href or "prefn" in href:
+            continue
+        heading = None
+        for node in itertools.islice(a.parents, 5):
+            h = heading_in.get(id(node))
+            if h is None:
+                continue
+            text = heading_text.get(id(h))
+            if text is None:
+                text = heading_text[id(h)] = h.get_text(strip=True)
+            if text:
+                heading = text
+                break
+        price_el, curr_el = None, None
+        for node in itertools.islice(a.parents, 8):
+            price_el = price_in.get(id(node))
+            if price_el is not None:
+                curr_el = currency_in.get(id(node))
+                break
+        tiles.append((a, heading, price_el, curr_el))
+    return tiles
+
 
 def _balenciaga_parse_by_product_links(soup: BeautifulSoup, config: dict):
     """
@@ -22,91 +173,78 @@ def _balenciaga_parse_by_product_links(soup: BeautifulSoup, config: dict):
     """
     list_cfg = config.get("list") or {}
     base_url = (config.get("base_url") or "").rstrip("/")
-    brand = config.get("brand", "balenciaga")
+    brand = _intern(config.get("brand", "balenciaga"))
     domain = "balenciaga.com"
 
-    items = []
-    for a in soup.select("a[href*='.html']"):
+    # 以链接为键去重：dict 保序，重复链接保留第一次出现的那条
+    items: Dict[str, Dict[str, Any]] = {}
+    # 没有 itemprop=price 的商品先记下 (链接, 价格文本)，循环结束后一次性批量解析
+    pending_prices = []
+    # 兜底价格文本按祖先节点缓存：相邻链接共享祖先，整段 get_text 只算一次
+    ancestor_price_text: Dict[int, Optional[str]] = {}
+    for a, heading, price_el, curr_el in _collect_tiles(soup):
         href = a.get("href") or ""
-        if "searchajax" in href or "prefn" in href:
-            continue
         if domain not in href and not href.startswith("/"):
             continue
         if href.startswith("/"):
             product_link = f"{base_url}{href}" if base_url else href
         else:
             product_link = href
+        if product_link in items:
+            continue
 
-        name = a.get_text(strip=True) or "(no name)"
-        parent = a.parent
-        for _ in range(5):
-            if not parent:
-                break
-            h = parent.find(["h2", "h3"])
-            if h and h.get_text(strip=True):
-                name = h.get_text(strip=True)
-                break
-            parent = getattr(parent, "parent", None)
+        name = heading or a.get_text(strip=True) or "(no name)"
 
         sale_price = None
         currency = None
-        node = a.parent
-        for _ in range(8):
-            if not node:
-                break
-            price_el = node.find(attrs={"itemprop": "price"})
-            if price_el:
-                content_val = price_el.get("content")
-                if content_val:
-                    try:
-                        sale_price = int(float(content_val))
-                    except (ValueError, TypeError):
-                        sale_price = extract_int_price(content_val)
-                if sale_price is None:
-                    sale_price = extract_int_price(price_el.get_text(strip=True))
-                curr_el = node.find(attrs={"itemprop": "priceCurrency"})
-                if curr_el:
-                    currency = (curr_el.get("content") or curr_el.get_text(strip=True) or "").upper() or None
-                if currency is None and node:
-                    currency = extract_currency(price_el.get_text(strip=True))
-                break
-            node = getattr(node, "parent", None)
+        if price_el is not None:
+            content_val = price_el.get("content")
+            if content_val:
+                try:
+                    sale_price = int(float(content_val))
+                except (ValueError, TypeError):
+                    sale_price = extract_int_price(content_val)
+            if sale_price is None:
+                sale_price = extract_int_price(price_el.get_text(strip=True))
+            if curr_el is not None:
+                currency = (curr_el.get("content") or curr_el.get_text(strip=True) or "").upper() or None
+            if currency is None:
+                currency = extract_currency(price_el.get_text(strip=True))
         if sale_price is None:
             price_text = None
-            node = a.parent
-            for _ in range(5):
-                if not node:
-                    break
-                txt = node.get_text(separator=" ", strip=True)
-                if re.search(r"RM\s*[\d,]+|€\s*[\d,]+|\$\s*[\d,]+", txt):
-                    price_text = txt
+            for node in itertools.islice(a.parents, 5):
+                key = id(node)
+                if key not in ancestor_price_text:
+                    txt = node.get_text(separator=" ", strip=True)
+                    ancestor_price_text[key] = txt if _PRICE_RE.search(txt) else None
+                if ancestor_price_text[key]:
+                    price_text = ancestor_price_text[key]
                     break
-                node = getattr(node, "parent", None)
-            sale_price = extract_int_price(price_text) if price_text else None
-            currency = extract_currency(price_text) if price_text else currency
+            if price_text:
+                pending_prices.append((product_link, price_text))
 
-        items.append({
+        items[product_link] = {
             "product_name": name,
             "product_link": product_link,
             "sale_price": sale_price,
             "regular_price": sale_price,
-            "currency": currency,
+            "currency": _intern(currency),
             "brand": brand,
             "product_id": None,
             "category": None,
-        })
-    seen = set()
-    unique = []
-    for it in items:
-        link = it.get("product_link")
-        if link and link not in seen:
-            seen.add(link)
-            unique.append(it)
-    return unique
+        }
+    if pending_prices:
+        prices, currencies = extract_prices_vec([text for _, text in pending_prices])
+        for (link, _), price, currency in zip(pending_prices, prices, currencies):
+            items[link]["sale_price"] = items[link]["regular_price"] = price
+            items[link]["currency"] = currency
+    return list(items.values())
 
 
 def balenciaga_list_parser(raw: BeautifulSoup, config: dict):
-    items = parse_list_generic(raw, config)
+    item_sel = ((config.get("list") or {}).get("selectors") or {}).get("item")
+    # 通用 item 选择器在页面上一个都匹配不到时，跳过 parse_list_generic 直接走兜底，少一次整树遍历
+    items = parse_list_generic(raw, config) if not item_sel or raw.select_one(item_sel) else []
     if not items:
         items = _balenciaga_parse_by_product_links(raw, config)
     return items
@@ -114,31 +252,31 @@ def balenciaga_list_parser(raw: BeautifulSoup, config: dict):
 
 def balenciaga_detail_parser(raw: BeautifulSoup, config: dict):
     out = {}
-    name_el = raw.select_one("h1.c-product__name") or raw.find(attrs={"itemprop": "name"})
+    name_el = _BALENCIAGA_SEL["name"].select_one(raw) or raw.find(attrs={"itemprop": "name"})
     if name_el:
         out["product_name"] = name_el.get_text(strip=True)
-    desc_el = raw.select_one("p.c-product__longdesc")
+    desc_el = _BALENCIAGA_SEL["desc"].select_one(raw)
     if desc_el:
         out["product_description"] = desc_el.get_text(strip=True)
-    img_el = raw.select_one("img.c-product__image") or raw.find("img", attrs={"itemprop": "image"})
+    img_el = _BALENCIAGA_SEL["img"].select_one(raw) or raw.find("img", attrs={"itemprop": "image"})
     if img_el:
         out["image_url"] = img_el.get("src") or img_el.get("data-src") or None
-    bread_links = raw.select(".c-breadcrumbs__link")
+    bread_links = _BALENCIAGA_SEL["bread"].select(raw)
     for link in bread_links:
         span = link.find("span", attrs={"itemprop": "name"})
         if span and span.get_text(strip=True):
             out["category"] = span.get_text(strip=True).replace("&amp;", "&")
             break
     pid = None
-    btn = raw.select_one("button[data-url*='pid=']")
+    btn = _BALENCIAGA_SEL["pid_btn"].select_one(raw)
     if btn:
         url_attr = btn.get("data-url") or ""
-        m = re.search(r"pid=([A-Za-z0-9_-]+)", url_attr)
+        m = _PID_BTN_RE.search(url_attr)
         if m:
             pid = m.group(1)
     if not pid and img_el:
         src = (img_el.get("src") or img_el.get("data-src") or "")
-        m = re.search(r"/([A-Za-z0-9_-]+)_[A-Z]\.jpg", src)
+        m = _PID_IMG_RE.search(src)
         if m:
             pid = m.group(1)
     if pid:
@@ -161,11 +299,21 @@ def balenciaga_detail_parser(raw: BeautifulSoup, config: dict):
 
 # === Chanel ===
 
+_CHANEL_SEL = {
+    "desc": sv.compile('[data-test="strHeroSplittedCollectionName"]'),
+    "cat": sv.compile('[data-test="strHeroSplittedProductName"]'),
+    "details": sv.compile('[data-testid="strProductDetails"]'),
+    "price": sv.compile("#hero-splitted-price-product"),
+    "price_alt": sv.compile('[data-test="strHeroSplittedProductPrice"] span'),
+    "img": sv.compile(".cc-hero-splitted__img-wrapper img"),
+    "img_alt": sv.compile(".cc-hero-splitted__img-low"),
+}
+
 
 def _chanel_extract_product_id_from_url(url: str) -> Optional[str]:
     if not url:
         return None
-    m = re.search(r"/p/([^/]+)/", url)
+    m = _PID_URL_RE.search(url)
     return m.group(1) if m else None
 
 
@@ -173,7 +321,7 @@ def chanel_list_parser(raw: BeautifulSoup, config: dict) -> List[Dict[str, Any]]
     list_cfg = config.get("list") or {}
     product_urls = list_cfg.get("product_urls")
     if product_urls and isinstance(product_urls, list):
-        brand = config.get("brand", "chanel")
+        brand = _intern(config.get("brand", "chanel"))
         items = []
         seen = set()
         for url in product_urls:
@@ -194,39 +342,41 @@ def chanel_list_parser(raw: BeautifulSoup, config: dict) -> List[Dict[str, Any]]
 
 def chanel_detail_parser(soup: BeautifulSoup, config: dict) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
-    desc_el = soup.select_one('[data-test="strHeroSplittedCollectionName"]')
+    desc_el = _CHANEL_SEL["desc"].select_one(soup)
     if desc_el:
         desc = desc_el.get_text(strip=True)
         if desc:
             out["product_description"] = desc
-    cat_el = soup.select_one('[data-test="strHeroSplittedProductName"]')
+    cat_el = _CHANEL_SEL["cat"].select_one(soup)
     if cat_el:
         cat = cat_el.get_text(strip=True)
         if cat:
             out["category"] = cat
-    details_el = soup.select_one('[data-testid="strProductDetails"]')
+    details_el = _CHANEL_SEL["details"].select_one(soup)
     if details_el:
-        for br in details_el.find_all("br"):
-            br.replace_with("|||")
-        text = details_el.get_text(strip=True)
-        parts = [p.strip() for p in text.split("|||") if p.strip()]
+        # 一次遍历按 <br> 切段（不再改写 soup）；段内字符串与 get_text(strip=True) 一样去空白后直接拼接
+        segments = [""]
+        for el in details_el.descendants:
+            if el.name == "br":
+                segments.append("")
+            elif type(el) in (NavigableString, CData):
+                segments[-1] += el.strip()
+        parts = [p for p in segments if p]
         if len(parts) >= 1 and parts[0]:
             out["attributes"] = [{"name": "Material", "value": parts[0]}]
         if len(parts) >= 2 and parts[1]:
             colors = [c.strip() for c in parts[1].split(",") if c.strip()]
             out["color_list"] = colors
             out["color_count"] = len(colors)
-    price_el = soup.select_one("#hero-splitted-price-product") or soup.select_one(
-        '[data-test="strHeroSplittedProductPrice"] span'
-    )
+    price_el = _CHANEL_SEL["price"].select_one(soup) or _CHANEL_SEL["price_alt"].select_one(soup)
     if price_el:
         price_text = price_el.get_text(strip=True)
         out["sale_price"] = extract_int_price(price_text)
         out["currency"] = extract_currency(price_text)
         out["regular_price"] = out["sale_price"]
     img_el = (
-        soup.select_one(".cc-hero-splitted__img-wrapper img")
-        or soup.select_one(".cc-hero-splitted__img-low")
+        _CHANEL_SEL["img"].select_one(soup)
+        or _CHANEL_SEL["img_alt"].select_one(soup)
     )
     if img_el and img_el.get("src"):
         out["image_url"] = img_el["src"].strip()
@@ -258,63 +408,67 @@ def louisvuitton_detail_parser(raw: BeautifulSoup, config: dict):
 # === Lululemon ===
 
 
+def _parse_lulu_tile(product, base_url: str, brand: str) -> Optional[Dict[str, Any]]:
+    """
+    解析单个 product-tile；缺失的字段记为 None。
+    data-lulu-attributes 不是合法 JSON 对象时整条丢弃（与原先异常即跳过的行为一致）。
+    """
+    name_tag = product.find("h3", class_="product-tile__product-name")
+    product_name = name_tag.get_text(strip=True) if name_tag else None
+    link_tag = product.find("a", class_="link")
+    href = link_tag.get("href") if link_tag else None
+    product_link = f"{base_url.rstrip('/')}{href}" if href and not href.startswith("http") else (href or None)
+
+    sale_price, regular_price = None, None
+    price_container = product.find("span", class_="price")
+    if price_container:
+        price_text = price_container.get_text(strip=True)
+        if "Sale Price" in price_text:
+            parts = price_text.split("Regular Price")
+            sale_price = parts[0].replace("Sale Price", "").strip()
+            regular_price = parts[1].strip() if len(parts) > 1 else None
+        elif "Regular Price" in price_text:
+            regular_price = price_text.replace("Regular Price", "").strip()
+    sale_price = extract_int_price(sale_price)
+    regular_price = extract_int_price(regular_price)
+
+    color_count_tag = product.find("p", class_="product-tile__color-count")
+    color_count = color_count_tag.get_text(strip=True) if color_count_tag else None
+    attributes_json = link_tag.get("data-lulu-attributes") if link_tag else None
+    attributes: Any = {}
+    if attributes_json:
+        try:
+            attributes = _json_loads(attributes_json)
+        except json.JSONDecodeError as e:
+            log.debug("[lululemon] list item parse error: %s", e)
+            return None
+    if not isinstance(attributes, dict) or not isinstance(attributes.get("product") or {}, dict):
+        log.debug("[lululemon] list item parse error: unexpected data-lulu-attributes %r", attributes_json)
+        return None
+    product_id = (attributes.get("product") or {}).get("productID")
+    category = None
+    if product_link:
+        match = _CAT_RE.search(product_link)
+        if match:
+            category = match.group(1)
+
+    return {
+        "product_name": product_name,
+        "product_link": product_link,
+        "sale_price": sale_price,
+        "regular_price": regular_price,
+        "color_count": color_count,
+        "productID": product_id,
+        "category": category,
+        "brand": brand,
+    }
+
+
 def lululemon_list_parser(raw: BeautifulSoup, config: dict) -> List[Dict[str, Any]]:
-    products = []
-    list_cfg = config.get("list") or {}
-    selectors = list_cfg.get("selectors") or {}
     base_url = config.get("base_url", "https://shop.lululemon.com")
-
+    brand = _intern(config.get("brand", "lululemon"))
     product_tiles = raw.find_all("div", class_="product-tile")
-    if not product_tiles:
-        return []
-
-    for product in product_tiles:
-        try:
-            name_tag = product.find("h3", class_="product-tile__product-name")
-            product_name = name_tag.get_text(strip=True) if name_tag else None
-            link_tag = product.find("a", class_="link")
-            href = link_tag.get("href") if link_tag else None
-            product_link = f"{base_url.rstrip('/')}{href}" if href and not href.startswith("http") else (href or None)
-
-            sale_price, regular_price = None, None
-            price_container = product.find("span", class_="price")
-            if price_container:
-                price_text = price_container.get_text(strip=True)
-                if "Sale Price" in price_text:
-                    parts = price_text.split("Regular Price")
-                    sale_price = parts[0].replace("Sale Price", "").strip()
-                    regular_price = parts[1].strip() if len(parts) > 1 else None
-                elif "Regular Price" in price_text:
-                    regular_price = price_text.replace("Regular Price", "").strip()
-            sale_price = extract_int_price(sale_price)
-            regular_price = extract_int_price(regular_price)
-
-            color_count_tag = product.find("p", class_="product-tile__color-count")
-            color_count = color_count_tag.get_text(strip=True) if color_count_tag else None
-            attributes_tag = product.find("a", class_="link")
-            attributes_json = attributes_tag.get("data-lulu-attributes") if attributes_tag else None
-            attributes = json.loads(attributes_json) if attributes_json else {}
-            product_id = (attributes.get("product") or {}).get("productID")
-            category = None
-            if product_link:
-                match = re.search(r"/p/([^/]+)/", product_link)
-                if match:
-                    category = match.group(1)
-
-            products.append({
-                "product_name": product_name,
-                "product_link": product_link,
-                "sale_price": sale_price,
-                "regular_price": regular_price,
-                "color_count": color_count,
-                "productID": product_id,
-                "category": category,
-                "brand": config.get("brand", "lululemon"),
-            })
-        except Exception as e:
-            print(f"[lululemon] list item parse error: {e}")
-            continue
-    return products
+    return [t for t in (_parse_lulu_tile(p, base_url, brand) for p in product_tiles) if t is not None]
 
 
 def _lululemon_extract_json_ld(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
@@ -322,7 +476,7 @@ def _lululemon_extract_json_ld(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
     if not script_tag or not script_tag.string:
         return None
     try:
-        return json.loads(script_tag.string)
+        return _json_loads(script_tag.string)
     except json.JSONDecodeError:
         return None
 
@@ -330,7 +484,7 @@ def _lululemon_extract_json_ld(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
 def _lululemon_extract_colors_from_detail(soup: BeautifulSoup) -> Optional[List[str]]:
     container = soup.find(attrs={"data-testid": "button-tile-group_group"})
     if not container:
-        container = soup.find(attrs={"role": "radiogroup", "aria-label": re.compile(r"select\s*colou?r", re.I)})
+        container = soup.find(attrs={"role": "radiogroup", "aria-label": _COLOR_LABEL_RE})
     if not container:
         return None
     tiles = container.find_all(attrs={"data-testid": "button-tile"})
@@ -346,30 +500,126 @@ def _lululemon_extract_colors_from_detail(soup: BeautifulSoup) -> Optional[List[
     return colors if colors else None
 
 
-def _lululemon_extract_sale_price_product_description(html_content: str, json_ld_data: Dict[str, Any]) -> tuple:
+# __NEXT_DATA__ 中「价格条目所在容器」的路径（键 / 下标序列）；首次整树查找后缓存，之后直接按路径取
+_LULU_PRICE_PATH: Optional[tuple] = None
+# run_details 的工作线程可能同时发现路径；写入在锁内进行。读取不加锁：拿到旧路径也只是多走一次整树遍历
+_lulu_price_path_lock = threading.Lock()
+_LULU_PRICE_NUM_RE = re.compile(r"[\d.]+")
+
+
+def _lululemon_price_entry(entry: Any, sku: str) -> bool:
+    return isinstance(entry, dict) and "list-price" in entry and str(entry.get("id")) == sku
+
+
+def _lululemon_price_value(value: Any) -> Optional[str]:
+    """只接受数字或纯数字字符串（与原正则 [\d.]+ 一致），其它类型返回 None，避免后续 float() 失败。"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str) and _LULU_PRICE_NUM_RE.fullmatch(value):
+        try:
+            float(value)
+        except ValueError:
+            return None
+        return value
+    return None
+
+
+def _lululemon_find_price_entry(data: Any, sku: str) -> Optional[Dict[str, Any]]:
+    """
+    在已解析的 __NEXT_DATA__ 中找 id == sku 且带 list-price 的对象。
+    先走缓存路径，只扫该容器的直接子项；路径失效或没有该 SKU 时才整树遍历，并更新缓存路径。
+    """
+    global _LULU_PRICE_PATH
+    cached_path = _LULU_PRICE_PATH
+    if cached_path is not None:
+        container = data
+        try:
+            for key in cached_path:
+                container = container[key]
+        except (KeyError, IndexError, TypeError):
+            container = None
+        if isinstance(container, (dict, list)):
+            values = container.values() if isinstance(container, dict) else container
+            for entry in values:
+                if _lululemon_price_entry(entry, sku):
+                    return entry
+    stack: List[tuple] = [(data, ())]
+    while stack:
+        node, path = stack.pop()
+        if _lululemon_price_entry(node, sku):
+            with _lulu_price_path_lock:
+                _LULU_PRICE_PATH = path[:-1]
+            return node
+        if isinstance(node, dict):
+            children = list(node.items())
+        elif isinstance(node, list):
+            children = list(enumerate(node))
+        else:
+            continue
+        stack.extend((child, path + (key,)) for key, child in reversed(children))
+    return None
+
+
+def _lululemon_regex_prices(texts: List[str], sku: str) -> tuple:
+    """按 SKU 正则在给定文本里定位价格对象，返回 (list_price, sale_price)；找不到为 (None, None)。"""
+    sku_re = re.compile(rf'"id":\s*"{re.escape(sku)}".*?}}')
+    for text in texts:
+        match = sku_re.search(text)
+        if match:
+            prices = _PRICES_RE.search(match.group(0))
+            if prices:
+                return prices.group("list_price"), prices.group("sale_price")
+    return None, None
+
+
+def _lululemon_extract_sale_price_product_description(
+    soup: BeautifulSoup, html_content: str, json_ld_data: Dict[str, Any]
+) -> tuple:
     sku = (json_ld_data or {}).get("sku") or ""
-    match = re.search(r'"whyWeMadeThisAttributes":\{.*?"text":"(.*?)".*?\}', html_content)
+    match = _WHY_MADE_RE.search(html_content)
     product_description = match.group(1) if match else None
-    match = re.search(rf'"id":\s*"{re.escape(sku)}".*?}}', html_content) if sku else None
-    list_price, sale_price = None, None
-    if match:
-        prices = re.search(r'"list-price":"(?P<list_price>[\d.]+)".*?"sale-price":"(?P<sale_price>[\d.]+)"', match.group(0))
-        if prices:
-            list_price = prices.group("list_price")
-            sale_price = prices.group("sale_price")
+    if not sku:
+        return None, None, product_description
+    script_tag = soup.find("script", id="__NEXT_DATA__")
+    if script_tag is None:
+        # 页面完全没有 __NEXT_DATA__：退回到在原始 HTML 上按 SKU 正则定位
+        list_price, sale_price = _lululemon_regex_prices([html_content], sku)
+        return list_price, sale_price, product_description
+    try:
+        data = _json_loads(script_tag.string or "")
+    except json.JSONDecodeError:
+        data = None
+    entry = _lululemon_find_price_entry(data, str(sku)) if data is not None else None
+    if entry is not None:
+        list_price = _lululemon_price_value(entry.get("list-price"))
+        sale_price = _lululemon_price_value(entry.get("sale-price"))
+        if list_price and sale_price:
+            return list_price, sale_price, product_description
+        return None, None, product_description
+    # __NEXT_DATA__ 里没有该 SKU：价格可能在其它内联状态脚本里，只在这些脚本文本上做正则兜底
+    other_scripts = [
+        tag.string for tag in soup.find_all("script")
+        if tag is not script_tag and tag.string and "list-price" in tag.string
+    ]
+    list_price, sale_price = _lululemon_regex_prices(other_scripts, sku)
     return list_price, sale_price, product_description
 
 
-def lululemon_detail_parser(raw: BeautifulSoup, config: dict) -> Dict[str, Any]:
+def lululemon_detail_parser(raw: BeautifulSoup, config: dict, html_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    html_text 为抓取到的原始 HTML；调用方传入时直接复用，避免 str(raw) 把整棵树重新序列化一遍。
+    """
     if not raw:
         return {}
     try:
-        html_content = str(raw)
         json_ld_data = _lululemon_extract_json_ld(raw)
         if not json_ld_data:
             return {}
+        html_content = html_text if html_text is not None else str(raw)
         list_price, sale_price, product_description = _lululemon_extract_sale_price_product_description(
-            html_content, json_ld_data
+            raw, html_content, json_ld_data
         )
         rating_value = (json_ld_data.get("aggregateRating") or {}).get("ratingValue")
         rating = float(rating_value) if rating_value and rating_value != "null" else None
@@ -387,7 +637,7 @@ def lululemon_detail_parser(raw: BeautifulSoup, config: dict) -> Dict[str, Any]:
             "color_count_number": len(colors_list) if colors_list else None,
         }
     except Exception as e:
-        print(f"[lululemon] detail_parser error: {e}")
+        log.debug("[lululemon] detail_parser error: %s", e)
         return {}
 
 
@@ -411,7 +661,7 @@ def miumiu_detail_parser(raw: BeautifulSoup, config: dict):
     if "attributes" not in out:
         out["attributes"] = []
     for p in raw.select("p"):
-        if re.match(r"Color\s*:?", p.get_text(strip=True) or ""):
+        if _COLOR_P_RE.match(p.get_text(strip=True) or ""):
             next_p = p.find_next_sibling("p")
             if next_p:
                 span = next_p.find("span")
@@ -470,6 +720,16 @@ def prada_detail_parser(raw: BeautifulSoup, config: dict):
 
 # === YSL ===
 
+_YSL_SEL = {
+    "price": sv.compile('[data-qa="pdp-mobile-price-field"]'),
+    "color": sv.compile("div.sc-15b44914-2 p"),
+    "color_alt": sv.compile("div.sc-4868c095-8"),
+    "desc": sv.compile("div.sc-15b44914-0 button.sc-15b44914-3"),
+    "desc_alt": sv.compile("button[data-imt-p]"),
+    "img": sv.compile('div[data-theme="ysl"] button.sc-53f2741a-3 img'),
+    "img_alt": sv.compile('div[data-theme="ysl"] button[type="button"] img'),
+}
+
 
 def ysl_list_parser(raw: BeautifulSoup, config: dict) -> List[Dict[str, Any]]:
     return parse_list_generic(raw, config)
@@ -477,31 +737,29 @@ def ysl_list_parser(raw: BeautifulSoup, config: dict) -> List[Dict[str, Any]]:
 
 def ysl_detail_parser(soup: BeautifulSoup, config: dict) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
-    price_el = soup.select_one('[data-qa="pdp-mobile-price-field"]')
+    price_el = _YSL_SEL["price"].select_one(soup)
     if price_el:
         price_text = price_el.get_text(strip=True)
         out["sale_price"] = extract_int_price(price_text)
         out["currency"] = extract_currency(price_text)
         out["regular_price"] = out["sale_price"]
 
-    color_el = soup.select_one("div.sc-15b44914-2 p") or soup.select_one("div.sc-4868c095-8")
+    color_el = _YSL_SEL["color"].select_one(soup) or _YSL_SEL["color_alt"].select_one(soup)
     if color_el:
         color = color_el.get_text(strip=True)
         if color and color.lower() not in ("other colors",):
             out["color_list"] = [color]
             out["color_count"] = 1
 
-    desc_el = soup.select_one("div.sc-15b44914-0 button.sc-15b44914-3") or soup.select_one(
-        "button[data-imt-p]"
-    )
+    desc_el = _YSL_SEL["desc"].select_one(soup) or _YSL_SEL["desc_alt"].select_one(soup)
     if desc_el:
         desc = desc_el.get_text(strip=True)
         if desc:
             out["product_description"] = desc
 
     img_el = (
-        soup.select_one('div[data-theme="ysl"] button.sc-53f2741a-3 img')
-        or soup.select_one('div[data-theme="ysl"] button[type="button"] img')
+        _YSL_SEL["img"].select_one(soup)
+        or _YSL_SEL["img_alt"].select_one(soup)
     )
     if img_el and img_el.get("src"):
         out["image_url"] = img_el["src"].strip()
@@ -532,53 +790,185 @@ def ysl_normalize(item: Dict[str, Any]) -> Dict[str, Any]:
     return rec
 
 
-# === get_parsers(site_id) ===
+# === detail_parser 结果缓存 ===
+
+_DETAIL_CACHE_MAX = 4096
+_detail_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+# run_details 会在线程池里调用 detail_parser，读/挪动/写入/淘汰都要在锁内完成
+_detail_cache_lock = threading.Lock()
+
+
+def _detail_cache_key(site_id: str, html_text: str) -> tuple:
+    return (site_id, hashlib.blake2b(html_text.encode("utf-8"), digest_size=16).hexdigest())
+
 
+def _detail_cache_get(key: tuple) -> Optional[Dict[str, Any]]:
+    with _detail_cache_lock:
+        cached = _detail_cache.get(key)
+        if cached is None:
+            return None
+        _detail_cache.move_to_end(key)
+    return copy.deepcopy(cached)
 
-def get_parsers(site_id: str) -> Dict[str, Optional[Callable]]:
+
+def _detail_cache_put(key: tuple, out: Dict[str, Any]) -> None:
+    snapshot = copy.deepcopy(out)
+    with _detail_cache_lock:
+        _detail_cache[key] = snapshot
+        _detail_cache.move_to_end(key)
+        while len(_detail_cache) > _DETAIL_CACHE_MAX:
+            _detail_cache.popitem(last=False)
+
+
+# site_id -> 未包装的 detail_parser；由 _cached_detail_parser 登记，供缓存包装与 run_details 共用
+_RAW_DETAIL_PARSERS: Dict[str, Callable] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _takes_html_text(parser: Callable) -> bool:
+    return "html_text" in inspect.signature(parser).parameters
+
+
+def _parse_detail_uncached(site_id: str, raw: BeautifulSoup, config: dict, html_text: str) -> Dict[str, Any]:
+    """不经缓存直接调用 site_id 的原始 detail_parser；只有声明了 html_text 参数的解析器才会收到原始 HTML。"""
+    parser = _RAW_DETAIL_PARSERS[site_id]
+    return parser(raw, config, html_text=html_text) if _takes_html_text(parser) else parser(raw, config)
+
+
+def _cached_detail_parser(site_id: str, parser: Callable) -> Callable:
+    """
+    包装 detail_parser：调用方传入原始 html_text 时，按 (site_id, blake2b(html)) 做进程内 LRU 缓存，
+    同一页面再次解析直接返回缓存结果的副本；未传 html_text 时照常解析、不缓存。
+    """
+    _RAW_DETAIL_PARSERS[site_id] = parser
+
+    @functools.wraps(parser, assigned=("__module__", "__name__", "__qualname__", "__doc__"))
+    def wrapper(raw: BeautifulSoup, config: dict, html_text: Optional[str] = None) -> Dict[str, Any]:
+        if html_text is None:
+            return parser(raw, config)
+        key = _detail_cache_key(site_id, html_text)
+        cached = _detail_cache_get(key)
+        if cached is not None:
+            return cached
+        out = _parse_detail_uncached(site_id, raw, config, html_text)
+        _detail_cache_put(key, out)
+        return out
+
+    # wraps 总会设置 __wrapped__，inspect.signature 随之报告原解析器的签名而漏掉 html_text；
+    # 只沿用名字与文档，注解与签名以包装函数自身为准
+    del wrapper.__wrapped__
+    return wrapper
+
+
+def clear_parser_caches() -> None:
+    """清空 detail_parser 结果缓存与 lululemon __NEXT_DATA__ 价格路径缓存（测试或需要强制重新解析时用）。"""
+    global _LULU_PRICE_PATH
+    with _detail_cache_lock:
+        _detail_cache.clear()
+    with _lulu_price_path_lock:
+        _LULU_PRICE_PATH = None
+
+
+# === 详情页并发抓取 + 解析 ===
+
+
+def _parse_detail_page(site_id: str, html: str, config: dict) -> Dict[str, Any]:
+    """先按页面内容查缓存，命中则连 soup 都不建；未命中才建 soup、解析并写回缓存。"""
+    key = _detail_cache_key(site_id, html)
+    cached = _detail_cache_get(key)
+    if cached is not None:
+        return cached
+    soup = make_soup(html, site_id, "detail")
+    out = _parse_detail_uncached(site_id, soup, config, html)
+    _detail_cache_put(key, out)
+    return out
+
+
+async def run_details(
+    site_id: str,
+    items: List[Dict[str, Any]],
+    fetch: Callable[[str], Awaitable[Optional[str]]],
+    config: dict,
+    max_concurrency: int = 16,
+) -> List[Dict[str, Any]]:
     """
-    返回该站的 list_parser、detail_fetcher、detail_parser、normalize。
-    未注册的站点或未实现的函数对应键为 None。
+    对 items 中每条的 product_link 并发抓取详情页并解析，返回与 items 一一对应的 detail 结果（失败为 {}）。
+    同时在途的「抓取 + 解析」不超过 max_concurrency（pipeline 里对应 opts["concurrency"]）；
+    查缓存、建 soup 与 detail_parser 放到线程里跑，只是为了不阻塞事件循环、让抓取继续进行；
+    bs4 建树时逐个标签回调 Python 代码，解析全程持有 GIL，多个线程并不能同时用上多核。
+    抓取失败与解析失败都以 warning 记录，对应结果为 {}。max_concurrency 小于 1 时抛 ValueError。
     """
-    result: Dict[str, Optional[Callable]] = {
-        "list_parser": None,
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency!r}")
+    if get_parsers(site_id)["detail_parser"] is None:
+        return [{} for _ in items]
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(item: Dict[str, Any]) -> Dict[str, Any]:
+        link = item.get("product_link")
+        if not link:
+            return {}
+        async with sem:
+            try:
+                html = await fetch(link)
+            except Exception as e:
+                log.warning("[%s] detail fetch %s failed: %s", site_id, link, e)
+                return {}
+            if not html:
+                return {}
+            try:
+                return await asyncio.to_thread(_parse_detail_page, site_id, html, config)
+            except Exception:
+                log.warning("[%s] detail parse %s failed", site_id, link, exc_info=True)
+                return {}
+
+    return await asyncio.gather(*(_one(item) for item in items))
+
+
+# === get_parsers(site_id) ===
+
+
+def _site_parsers(
+    site_id: str,
+    list_parser: Callable,
+    detail_parser: Optional[Callable] = None,
+    normalize: Optional[Callable] = None,
+) -> Mapping[str, Optional[Callable]]:
+    return MappingProxyType({
+        "list_parser": list_parser,
         "detail_fetcher": None,
-        "detail_parser": None,
-        "normalize": None,
-    }
-    if site_id == "balenciaga":
-        result["list_parser"] = balenciaga_list_parser
-        result["detail_parser"] = balenciaga_detail_parser
-    elif site_id == "chanel":
-        result["list_parser"] = chanel_list_parser
-        result["detail_parser"] = chanel_detail_parser
-        result["normalize"] = chanel_normalize
-    elif site_id == "louisvuitton":
-        result["list_parser"] = louisvuitton_list_parser
-        result["detail_parser"] = louisvuitton_detail_parser
-    elif site_id == "lululemon":
-        result["list_parser"] = lululemon_list_parser
-        result["detail_parser"] = lululemon_detail_parser
-    elif site_id == "miumiu":
-        result["list_parser"] = miumiu_list_parser
-        result["detail_parser"] = miumiu_detail_parser
-    elif site_id == "prada":
-        result["list_parser"] = prada_list_parser
-        result["detail_parser"] = prada_detail_parser
-    elif site_id == "ysl":
-        result["list_parser"] = ysl_list_parser
-        result["detail_parser"] = ysl_detail_parser
-        result["normalize"] = ysl_normalize
-    if result["list_parser"] is None:
-        raise ValueError(f"site_id={site_id} must provide list_parser in sites.parsers")
-    return result
+        "detail_parser": _cached_detail_parser(site_id, detail_parser) if detail_parser else None,
+        "normalize": normalize,
+        "make_soup": lambda html, page="list": make_soup(html, site_id, page),
+    })
+
+
+# 导入时建好一次；值为只读视图，多次 get_parsers 返回同一对象，调用方不可修改
+_PARSERS_BY_SITE: Dict[str, Mapping[str, Optional[Callable]]] = {
+    "balenciaga": _site_parsers("balenciaga", balenciaga_list_parser, balenciaga_detail_parser),
+    "chanel": _site_parsers("chanel", chanel_list_parser, chanel_detail_parser, chanel_normalize),
+    "louisvuitton": _site_parsers("louisvuitton", louisvuitton_list_parser, louisvuitton_detail_parser),
+    "lululemon": _site_parsers("lululemon", lululemon_list_parser, lululemon_detail_parser),
+    "miumiu": _site_parsers("miumiu", miumiu_list_parser, miumiu_detail_parser),
+    "prada": _site_parsers("prada", prada_list_parser, prada_detail_parser),
+    "ysl": _site_parsers("ysl", ysl_list_parser, ysl_detail_parser, ysl_normalize),
+}
+
+
+def get_parsers(site_id: str) -> Mapping[str, Optional[Callable]]:
+    """
+    返回该站的 list_parser、detail_fetcher、detail_parser、normalize、make_soup（只读映射）。
+    未实现的函数对应键为 None；未注册的站点抛 ValueError。
+    """
+    try:
+        return _PARSERS_BY_SITE[site_id]
+    except KeyError:
+        raise ValueError(f"site_id={site_id} must provide list_parser in sites.parsers") from None
 
 
 if __name__ == "__main__":
     # 直接跑时：依次跑所有站点，每个站点的 JSON 写入 output/{site_id}_parsers.json，终端只打摘要
     # 请在项目根目录执行: python3 -m sites.parsers  （cd scraper_pipeline 后）
-    import asyncio
-    import json
     import os
 
     from core.pipeline import run as run_pipeline
@@ -589,28 +979,48 @@ if __name__ == "__main__":
     _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     OUTPUT_DIR = os.path.join(_root, "output")
 
+    def _drop_none(d: dict) -> dict:
+        return {k: v for k, v in d.items() if v is not None}
+
+    def _dump(path: str, products: List[Dict[str, Any]]) -> None:
+        body = {"products": [_drop_none(p) for p in products], "swatches": []}
+        if orjson is not None:
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(
+                    body, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+                ))
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(body, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+
     async def _main():
         opts = {"fetch_detail": False, "output_dir": None}
         all_by_site = {}
-        for site_id in SITE_IDS:
-            try:
-                products = await run_pipeline(site_id=site_id, opts=opts)
-                all_by_site[site_id] = products
-            except Exception as e:
-                print(f"[parsers] {site_id} failed: {e}", file=__import__("sys").stderr)
+        # 各站点互不依赖，并发跑；每个站点拿一份 opts 副本，避免 pipeline 内部修改互相影响
+        results = await asyncio.gather(
+            *(run_pipeline(site_id=site_id, opts=dict(opts)) for site_id in SITE_IDS),
+            return_exceptions=True,
+        )
+        for site_id, products in zip(SITE_IDS, results):
+            # CancelledError 等只继承 BaseException，也要当作失败处理
+            if isinstance(products, BaseException):
+                print(f"[parsers] {site_id} failed: {products!r}", file=sys.stderr)
                 all_by_site[site_id] = []
+            else:
+                all_by_site[site_id] = products
+
+        # 各站点的去 None、JSON 编码与写盘放到线程里并行
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        await asyncio.gather(*(
+            asyncio.to_thread(_dump, os.path.join(OUTPUT_DIR, f"{site_id}_parsers.json"), products)
+            for site_id, products in all_by_site.items()
+        ))
         return all_by_site
 
     all_by_site = asyncio.run(_main())
 
-    def _drop_none(d: dict) -> dict:
-        return {k: v for k, v in d.items() if v is not None}
-
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
     for site_id, products in all_by_site.items():
         path = os.path.join(OUTPUT_DIR, f"{site_id}_parsers.json")
-        body = {"products": [_drop_none(p) for p in products], "swatches": []}
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(body, f, ensure_ascii=False, indent=2)
         print(f"{site_id}: {len(products)} products -> {path}")
     print(f"Done. All JSON under {OUTPUT_DIR}")